@@ -1,8 +1,14 @@
 import subprocess
+import bisect
 import datetime
-from collections import Counter
+import heapq
+import os
+from collections import Counter, namedtuple
 import sys
 import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 # Optional: GUI support
 try:
@@ -22,58 +28,169 @@ LONG_SESSION_HOURS = 3
 LATE_NIGHT_START = 22  # 22:00
 LATE_NIGHT_END = 6     # 06:00
 MIN_BREAK_MINUTES = 5
+HISTORY_DAYS = 8       # a full week of totals plus the session in progress
 
+# Clock-based reminders: (title, message, interval in minutes)
+REMINDERS = (
+    ("Hydration Reminder", "Time to drink some water!", 60),
+    ("Activity Reminder", "Stand up and stretch for a few minutes!", 90),
+    ("Ergonomics Tip", "Check your posture and desk setup. 20-20-20 rule: every 20 minutes, look at something 20 feet away for 20 seconds.", 120),
+    ("Mood Check-In", "How are you feeling? Take a moment to reflect on your mood and stress level.", 180),
+)
 
-def get_git_commit_times():
-    """Return a list of commit datetime objects from git log."""
+# Commit-based alerts: (title, message); the long-session message takes the session count
+LONG_SESSION_ALERT = ("Developer Health Alert", "You had {count} long coding session(s). Remember to take breaks!")
+NO_BREAK_ALERT = ("Break Reminder", "You've been coding for over 2 hours without a significant break. Please take a break!")
+NIGHT_OWL_ALERT = ("Night Owl Alert", "You committed code late at night. Prioritize rest for better productivity.")
+DAILY_LIMIT_ALERT = ("Work Limit Warning", "You've coded more than 8 hours today. Consider taking a longer break!")
+WEEKLY_LIMIT_ALERT = ("Weekly Limit Warning", "You've coded more than 40 hours this week. Watch for burnout!")
+HEALTHY_HABITS_NOTICE = ("Great Job!", "✅ Your coding habits look healthy! Keep it up!")
+
+# One of each health alert and reminder, for the GUI and CLI test modes to show in turn
+ALL_TEST_NOTIFICATIONS = (
+    (LONG_SESSION_ALERT[0], LONG_SESSION_ALERT[1].format(count=2)),
+    NO_BREAK_ALERT,
+    NIGHT_OWL_ALERT,
+    DAILY_LIMIT_ALERT,
+    WEEKLY_LIMIT_ALERT,
+    *((title, msg) for title, msg, _ in REMINDERS),
+    HEALTHY_HABITS_NOTICE,
+)
+
+
+# Sorted commit timestamps from the last HISTORY_DAYS, reused until the reflog changes
+_COMMIT_CACHE = {"key": None, "value": [], "reflog_path": None}
+_COMMIT_CACHE_LOCK = threading.Lock()
+
+
+# git runs on its own worker so a slow or cold repository never stalls the monitor
+_git_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="git-log")
+GIT_TIMEOUT_SECONDS = 5
+# Only the committer timestamp is parsed, so ask git for nothing else. Merge
+# commits are skipped since they don't reflect time spent writing code.
+_GIT_LOG_ARGV = ("git", "log", "--no-merges", "--no-notes", "--no-decorate", "--no-abbrev", "--pretty=format:%ct")
+
+
+def _git_state_key():
+    """Return a key that changes whenever HEAD moves, or None if it can't be determined."""
+    # The HEAD reflog is appended to on every commit, checkout and reset. Ask git
+    # where it lives once, so subdirectories, worktrees and submodules work too.
+    # Without a reflog there is no cheap signal, so the caller falls back to running git.
+    if _COMMIT_CACHE["reflog_path"] is None:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--git-path", "logs/HEAD"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                check=True
+            )
+        except Exception:
+            return None
+        _COMMIT_CACHE["reflog_path"] = os.path.abspath(result.stdout.strip())
     try:
-        result = subprocess.run(
-            ["git", "log", "--pretty=format:%ct"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
-        timestamps = [int(line) for line in result.stdout.strip().split("\n") if line.strip()]
-        return [datetime.datetime.fromtimestamp(ts) for ts in timestamps]
-    except Exception as e:
-        print(f"Error reading git log: {e}")
-        return []
+        st = os.stat(_COMMIT_CACHE["reflog_path"])
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def get_git_commit_times():
+    """Return a sorted list of unix commit timestamps from the last HISTORY_DAYS of git log."""
+    with _COMMIT_CACHE_LOCK:
+        key = _git_state_key()
+        if key is not None and key == _COMMIT_CACHE["key"]:
+            # Nothing new from git, but commits still age out of the window
+            cached = _COMMIT_CACHE["value"]
+            start = bisect.bisect_left(cached, time.time() - HISTORY_DAYS * 86400)
+            if start:
+                _COMMIT_CACHE["value"] = cached[start:]
+            return _COMMIT_CACHE["value"]
+        # Any reflog change can mean a reset, rebase or pull rather than a new
+        # commit, so the bounded window is always re-read as a whole
+        argv = [*_GIT_LOG_ARGV, f"--since={HISTORY_DAYS}.days"]
+        try:
+            # Parse lines as git writes them instead of buffering the whole output
+            with subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 16) as proc:
+                commit_times = sorted(int(line) for line in proc.stdout if line.strip())
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, argv)
+        except Exception as e:
+            print(f"Error reading git log: {e}")
+            return []
+        _COMMIT_CACHE["key"] = key
+        _COMMIT_CACHE["value"] = commit_times
+        return commit_times
+
+@lru_cache(maxsize=1 << 17)
+def _ts_to_dt(ts):
+    """Return the local datetime for a unix timestamp, memoized across ticks."""
+    return datetime.datetime.fromtimestamp(ts)
+
+def _local_hour(ts):
+    """Return the local hour of day (0-23) for a unix timestamp."""
+    return _ts_to_dt(ts).hour
+
+def _is_late_night(hour):
+    """Return True if the hour falls between LATE_NIGHT_START and LATE_NIGHT_END."""
+    # Distance from the start, mod 24, also works for windows that don't wrap midnight
+    return (hour - LATE_NIGHT_START) % 24 < (LATE_NIGHT_END - LATE_NIGHT_START) % 24
+
+# A run of commits with no gap longer than MIN_BREAK_MINUTES. Only the bounds, the
+# longest gap between commits and the late-night count are kept; nothing downstream
+# needs the individual commit times.
+Session = namedtuple("Session", "start_ts end_ts max_gap late_night_count")
 
 def analyze_sessions(commit_times):
     if not commit_times:
         print("No commit data found.")
         return
     commit_times = sorted(commit_times)
+    break_gap = MIN_BREAK_MINUTES * 60  # seconds
     sessions = []
-    session = [commit_times[0]]
-    for prev, curr in zip(commit_times, commit_times[1:]):
-        diff = (curr - prev).total_seconds() / 60  # minutes
-        if diff > MIN_BREAK_MINUTES:
-            sessions.append(session)
-            session = [curr]
-        else:
-            session.append(curr)
-    if session:
-        sessions.append(session)
+    start = prev = commit_times[0]
+    max_gap = late_night_count = 0
+    for curr in commit_times:
+        gap = curr - prev
+        if gap > break_gap:
+            sessions.append(Session(start, prev, max_gap, late_night_count))
+            start = curr
+            max_gap = late_night_count = 0
+        elif gap > max_gap:
+            max_gap = gap
+        if _is_late_night(_local_hour(curr)):
+            late_night_count += 1
+        prev = curr
+    sessions.append(Session(start, prev, max_gap, late_night_count))
     return sessions
 
-def get_summary_text(sessions):
+SummaryStats = namedtuple("SummaryStats", "long_sessions no_break_sessions late_night_count")
+
+def build_summary(sessions):
+    """Return the summary text and the SummaryStats it was built from."""
+    # Computed once here and shared by the summary, the CLI popup and the monitor loop
+    long_sessions = []
+    no_break_sessions = []
+    for s in sessions:
+        hours = (s.end_ts - s.start_ts) / 3600
+        if hours > LONG_SESSION_HOURS:
+            long_sessions.append(s)
+        if s.max_gap < 3600 and hours > 2:
+            no_break_sessions.append(s)
+    late_night_count = sum(s.late_night_count for s in sessions)
+    stats = SummaryStats(long_sessions, no_break_sessions, late_night_count)
     lines = []
     lines.append("--- Developer Health Summary ---\n")
-    long_sessions = [s for s in sessions if (s[-1] - s[0]).total_seconds() / 3600 > LONG_SESSION_HOURS]
-    late_night_commits = [c for s in sessions for c in s if LATE_NIGHT_START <= c.hour or c.hour < LATE_NIGHT_END]
-    lines.append(f"Total coding sessions: {len(sessions)}")
+    lines.append(f"Coding sessions (last {HISTORY_DAYS} days): {len(sessions)}")
     lines.append(f"Long sessions (> {LONG_SESSION_HOURS}h): {len(long_sessions)}")
-    lines.append(f"Late-night commits (22:00-06:00): {len(late_night_commits)}")
+    lines.append(f"Late-night commits ({LATE_NIGHT_START:02d}:00-{LATE_NIGHT_END:02d}:00): {late_night_count}")
     if long_sessions:
         lines.append("\n⚠️  You had some long coding sessions. Remember to take breaks!")
-    if late_night_commits:
+    if late_night_count:
         lines.append("\n⚠️  You committed code late at night. Prioritize rest for better productivity.")
-    if not long_sessions and not late_night_commits:
+    if not long_sessions and not late_night_count:
         lines.append("\n✅ Your coding habits look healthy!")
     lines.append("\nAll analysis is local. Your data never leaves your machine.")
-    return "\n".join(lines)
+    return "\n".join(lines), stats
 
 def show_native_notification(title, message):
     # Try plyer notification first
@@ -97,51 +214,74 @@ def show_native_notification(title, message):
     print(f"[NOTIFICATION] {title}: {message}")
 
 def print_summary(sessions):
-    summary = get_summary_text(sessions)
+    summary, stats = build_summary(sessions)
     print(summary)
     # Show popup for both healthy and unhealthy patterns
-    long_sessions = [s for s in sessions if (s[-1] - s[0]).total_seconds() / 3600 > LONG_SESSION_HOURS]
-    late_night_commits = [c for s in sessions for c in s if LATE_NIGHT_START <= c.hour or c.hour < LATE_NIGHT_END]
-    if long_sessions or late_night_commits:
+    long_sessions = stats.long_sessions
+    late_night_count = stats.late_night_count
+    if long_sessions or late_night_count:
         msg = ""
         if long_sessions:
             msg += f"You had {len(long_sessions)} long coding session(s). Remember to take breaks!\n"
-        if late_night_commits:
+        if late_night_count:
             msg += f"You committed code late at night. Prioritize rest!"
         show_native_notification("Developer Health Alert", msg.strip())
     else:
         show_native_notification("Developer Health", "✅ Your coding habits look healthy!")
 
-import time
-
 def health_check_loop(show_popup_func, print_func=None, stop_event=None):
+    if stop_event is None:
+        stop_event = threading.Event()
     # State for reminders and tracking
     last_break_reminder = None
-    last_hydration_reminder = None
-    last_activity_reminder = None
-    last_ergonomics_tip = None
-    last_mood_check = None
     daily_coding_minutes = 0
     weekly_coding_minutes = 0
     last_day = None
     last_week = None
-    hydration_interval = 60  # minutes
-    activity_interval = 90   # minutes
-    mood_check_interval = 180 # minutes
-    ergonomics_interval = 120 # minutes
+    last_processed_ts = None  # newest commit already added to the totals
+    # Min-heap of (due unix time, index into REMINDERS)
+    reminder_queue = [(time.time(), i) for i in range(len(REMINDERS))]
     positive_reinforcement_given = False
     first_run = True
+    commit_times = None
+    sessions = None
+    git_future = None
     
     while True:
         now = datetime.datetime.now()
-        commit_times = get_git_commit_times()
-        sessions = analyze_sessions(commit_times)
+        # A git call still running from an earlier tick is waited on again
+        # rather than queueing another one behind it
+        if git_future is None or git_future.done():
+            git_future = _git_pool.submit(get_git_commit_times)
+        # Hydration/activity/ergonomics/mood reminders only depend on the clock,
+        # so they are worked out while git runs and fire even if git is slow
+        reminders = []
+        if not first_run:
+            now_ts = now.timestamp()
+            due = []
+            while reminder_queue and reminder_queue[0][0] <= now_ts:
+                due.append(heapq.heappop(reminder_queue)[1])
+            # Due times drift by however long each tick took, so show whatever is
+            # due this tick in the order REMINDERS lists them
+            for i in sorted(due):
+                title, msg, interval = REMINDERS[i]
+                reminders.append((title, msg))
+                heapq.heappush(reminder_queue, (now_ts + interval * 60, i))
+        try:
+            latest_commit_times = git_future.result(timeout=GIT_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            latest_commit_times = commit_times
+        # get_git_commit_times hands back the same list until .git/logs/HEAD changes
+        # or commits age out of the window, so sessions are only rebuilt then
+        if latest_commit_times is not commit_times:
+            commit_times = latest_commit_times
+            sessions = analyze_sessions(commit_times)
         if first_run:
             show_popup_func("Developer Health Monitor", "Monitoring started! You'll receive health notifications every 10 minutes.")
             first_run = False
         else:
             if sessions:
-                summary = get_summary_text(sessions)
+                summary, stats = build_summary(sessions)
                 if print_func:
                     print_func(summary)
                 # Calculate daily/weekly coding time
@@ -154,63 +294,61 @@ def health_check_loop(show_popup_func, print_func=None, stop_event=None):
                 if last_week != week:
                     weekly_coding_minutes = 0
                     last_week = week
-                # Add up today's and this week's coding minutes
-                for s in sessions:
-                    if s[0].date() == today:
-                        daily_coding_minutes += int((s[-1] - s[0]).total_seconds() / 60)
-                    if s[0].isocalendar()[1] == week:
-                        weekly_coding_minutes += int((s[-1] - s[0]).total_seconds() / 60)
+                # Local midnight today and at the start of the ISO week, as unix times,
+                # so sessions can be bucketed by comparing their integer start times
+                day_start_ts = datetime.datetime.combine(today, datetime.time.min).timestamp()
+                week_start_ts = datetime.datetime.combine(today - datetime.timedelta(days=today.weekday()), datetime.time.min).timestamp()
+                # Add up today's and this week's coding minutes. Only time not counted on
+                # an earlier tick is added: new sessions, plus whatever the session that
+                # was in progress last time has grown by since
+                for s in reversed(sessions):
+                    if last_processed_ts is not None and s.end_ts <= last_processed_ts:
+                        break
+                    counted_from = s.start_ts if last_processed_ts is None else max(s.start_ts, last_processed_ts)
+                    new_minutes = (s.end_ts - counted_from) / 60
+                    if s.start_ts >= day_start_ts:
+                        daily_coding_minutes += new_minutes
+                    if s.start_ts >= week_start_ts:
+                        weekly_coding_minutes += new_minutes
+                # Never moves backwards, or a reset that drops the newest commit would
+                # let the same stretch of time be counted again
+                last_processed_ts = sessions[-1].end_ts if last_processed_ts is None else max(last_processed_ts, sessions[-1].end_ts)
                 # Break detection
-                long_sessions = [s for s in sessions if (s[-1] - s[0]).total_seconds() / 3600 > LONG_SESSION_HOURS]
-                no_break_sessions = [s for s in sessions if all((curr - prev).total_seconds() / 60 < 60 for prev, curr in zip(s, s[1:])) and (s[-1] - s[0]).total_seconds() / 3600 > 2]
+                long_sessions = stats.long_sessions
+                no_break_sessions = stats.no_break_sessions
                 # Night owl
-                late_night_commits = [c for s in sessions for c in s if LATE_NIGHT_START <= c.hour or c.hour < LATE_NIGHT_END]
-                # Hydration/activity/ergonomics/mood reminders
-                minutes_since_last_hydration = (now - last_hydration_reminder).total_seconds() / 60 if last_hydration_reminder else hydration_interval+1
-                minutes_since_last_activity = (now - last_activity_reminder).total_seconds() / 60 if last_activity_reminder else activity_interval+1
-                minutes_since_last_ergonomics = (now - last_ergonomics_tip).total_seconds() / 60 if last_ergonomics_tip else ergonomics_interval+1
-                minutes_since_last_mood = (now - last_mood_check).total_seconds() / 60 if last_mood_check else mood_check_interval+1
+                late_night_count = stats.late_night_count
                 # Collect notifications
                 notifications = []
                 if long_sessions:
-                    notifications.append(("Developer Health Alert", f"You had {len(long_sessions)} long coding session(s). Remember to take breaks!"))
+                    title, msg = LONG_SESSION_ALERT
+                    notifications.append((title, msg.format(count=len(long_sessions))))
                 if no_break_sessions:
-                    notifications.append(("Break Reminder", "You've been coding for over 2 hours without a significant break. Please take a break!"))
-                if late_night_commits:
-                    notifications.append(("Night Owl Alert", f"You committed code late at night. Prioritize rest for better productivity."))
+                    notifications.append(NO_BREAK_ALERT)
+                if late_night_count:
+                    notifications.append(NIGHT_OWL_ALERT)
                 if daily_coding_minutes > 8*60:
-                    notifications.append(("Work Limit Warning", "You've coded more than 8 hours today. Consider taking a longer break!"))
+                    notifications.append(DAILY_LIMIT_ALERT)
                 if weekly_coding_minutes > 40*60:
-                    notifications.append(("Weekly Limit Warning", "You've coded more than 40 hours this week. Watch for burnout!"))
-                if minutes_since_last_hydration > hydration_interval:
-                    notifications.append(("Hydration Reminder", "Time to drink some water!"))
-                    last_hydration_reminder = now
-                if minutes_since_last_activity > activity_interval:
-                    notifications.append(("Activity Reminder", "Stand up and stretch for a few minutes!"))
-                    last_activity_reminder = now
-                if minutes_since_last_ergonomics > ergonomics_interval:
-                    notifications.append(("Ergonomics Tip", "Check your posture and desk setup. 20-20-20 rule: every 20 minutes, look at something 20 feet away for 20 seconds."))
-                    last_ergonomics_tip = now
-                if minutes_since_last_mood > mood_check_interval:
-                    notifications.append(("Mood Check-In", "How are you feeling? Take a moment to reflect on your mood and stress level."))
-                    last_mood_check = now
-                if not (long_sessions or no_break_sessions or late_night_commits or daily_coding_minutes > 8*60 or weekly_coding_minutes > 40*60):
+                    notifications.append(WEEKLY_LIMIT_ALERT)
+                notifications.extend(reminders)
+                if not (long_sessions or no_break_sessions or late_night_count or daily_coding_minutes > 8*60 or weekly_coding_minutes > 40*60):
                     if not positive_reinforcement_given:
-                        notifications.append(("Great Job!", "✅ Your coding habits look healthy! Keep it up!"))
+                        notifications.append(HEALTHY_HABITS_NOTICE)
                         positive_reinforcement_given = True
-                # Show notifications with 2s delay between each
-                for title, msg in notifications:
-                    show_popup_func(title, msg)
-                    time.sleep(2)
             else:
                 if print_func:
                     print_func("No commit data found.")
                 show_popup_func("Developer Health Monitor", "No commit data found.")
-        # Wait 10 minutes before next check
-        for _ in range(600):
-            if stop_event and stop_event.is_set():
-                return
-            time.sleep(1)
+                notifications = reminders
+            # Show notifications with 2s delay between each, stopping early on shutdown
+            for title, msg in notifications:
+                show_popup_func(title, msg)
+                if stop_event.wait(2):
+                    return
+        # Wait 10 minutes before next check, waking early on shutdown
+        if stop_event.wait(600):
+            return
 
 def main():
     health_check_loop(show_native_notification, print)
@@ -226,16 +364,27 @@ def run_gui(test_mode=False):
     stop_event = threading.Event()
 
     def analyze_and_display():
-        commit_times = get_git_commit_times()
-        sessions = analyze_sessions(commit_times)
-        if sessions:
-            summary = get_summary_text(sessions)
-            text_area.config(state='normal')
-            text_area.delete(1.0, tk.END)
-            text_area.insert(tk.END, summary)
-            text_area.config(state='disabled')
-        else:
-            messagebox.showinfo("No Data", "No commit data found.")
+        # git runs on the worker pool and the result is polled from the Tk event
+        # loop, so the window keeps responding while git log is running
+        analyze_btn.config(state='disabled')
+        future = _git_pool.submit(get_git_commit_times)
+
+        def display_when_ready():
+            if not future.done():
+                window.after(100, display_when_ready)
+                return
+            analyze_btn.config(state='normal')
+            sessions = analyze_sessions(future.result())
+            if sessions:
+                summary, _ = build_summary(sessions)
+                text_area.config(state='normal')
+                text_area.delete(1.0, tk.END)
+                text_area.insert(tk.END, summary)
+                text_area.config(state='disabled')
+            else:
+                messagebox.showinfo("No Data", "No commit data found.")
+
+        display_when_ready()
 
     def gui_show_popup(title, message):
         # Thread-safe popup in tkinter
@@ -250,20 +399,8 @@ def run_gui(test_mode=False):
 
     if test_mode:
         def test_popups_gui():
-            notifications = [
-                ("Developer Health Alert", "You had 2 long coding session(s). Remember to take breaks!"),
-                ("Break Reminder", "You've been coding for over 2 hours without a significant break. Please take a break!"),
-                ("Night Owl Alert", "You committed code late at night. Prioritize rest for better productivity."),
-                ("Work Limit Warning", "You've coded more than 8 hours today. Consider taking a longer break!"),
-                ("Weekly Limit Warning", "You've coded more than 40 hours this week. Watch for burnout!"),
-                ("Hydration Reminder", "Time to drink some water!"),
-                ("Activity Reminder", "Stand up and stretch for a few minutes!"),
-                ("Ergonomics Tip", "Check your posture and desk setup. 20-20-20 rule: every 20 minutes, look at something 20 feet away for 20 seconds."),
-                ("Mood Check-In", "How are you feeling? Take a moment to reflect on your mood and stress level."),
-                ("Great Job!", "✅ Your coding habits look healthy! Keep it up!"),
-            ]
             def show_all():
-                for i, (title, msg) in enumerate(notifications):
+                for i, (title, msg) in enumerate(ALL_TEST_NOTIFICATIONS):
                     window.after(i * 2000, lambda t=title, m=msg: messagebox.showinfo(t, m))
             show_all()
         test_btn = tk.Button(window, text="Test All Popups", command=test_popups_gui)
@@ -283,19 +420,7 @@ def cli_test():
     print("Developer Health Monitor CLI Test Mode")
     print("Type 'pup-1' to trigger all popups in sequence (2s interval). Type 'exit' to quit.")
     def test_popups():
-        notifications = [
-            ("Developer Health Alert", "You had 2 long coding session(s). Remember to take breaks!"),
-            ("Break Reminder", "You've been coding for over 2 hours without a significant break. Please take a break!"),
-            ("Night Owl Alert", "You committed code late at night. Prioritize rest for better productivity."),
-            ("Work Limit Warning", "You've coded more than 8 hours today. Consider taking a longer break!"),
-            ("Weekly Limit Warning", "You've coded more than 40 hours this week. Watch for burnout!"),
-            ("Hydration Reminder", "Time to drink some water!"),
-            ("Activity Reminder", "Stand up and stretch for a few minutes!"),
-            ("Ergonomics Tip", "Check your posture and desk setup. 20-20-20 rule: every 20 minutes, look at something 20 feet away for 20 seconds."),
-            ("Mood Check-In", "How are you feeling? Take a moment to reflect on your mood and stress level."),
-            ("Great Job!", "✅ Your coding habits look healthy! Keep it up!"),
-        ]
-        for title, msg in notifications:
+        for title, msg in ALL_TEST_NOTIFICATIONS:
             show_native_notification(title, msg)
             time.sleep(2)
     while True: